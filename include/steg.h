@@ -21,6 +21,10 @@
 #define STEG_ERROR_CAPACITY        3
 #define STEG_ERROR_IO              4
 #define STEG_ERROR_PNG             5
+#define STEG_ERROR_VERIFY          6
+
+/* SHA-256 digest length used by steg_verify */
+#define STEG_DIGEST_SIZE           32
 
 /* PNG color types (matching PNG standard values) */
 typedef enum {
@@ -77,6 +81,8 @@ bool image_finalize_write(ImageInfo *info);
 /* Steganography functions */
 bool steg_embed(const char *cover_path, const char *payload_path, const char *steg_path);
 bool steg_extract(const char *steg_path, const char *output_path);
+int steg_verify(const char *cover_path, const char *payload_path, const char *steg_path,
+                const char *expected_hex);
 
 /* Inline bit manipulation functions for performance */
 static inline bool steg_write_bit(StegContext *ctx, uint8_t bit, uint32_t offset) {
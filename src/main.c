@@ -9,13 +9,112 @@ static void show_usage(void) {
                     "Usage:\n"
                     "  pxpl embed   <cover.png> <payload.bin> <steg.png>\n"
                     "  pxpl extract <steg.png> <output.bin>\n"
+                    "  pxpl verify  <cover.png> <payload.bin> <steg.png> <sha256-hex>\n"
+                    "  pxpl --server  (read tab-separated commands from stdin)\n"
                     "Return codes:\n"
                     "  0 - Success\n"
                     "  1 - Incorrect arguments\n"
                     "  2 - Unsupported or corrupt image\n"
                     "  3 - Cover image too small\n"
                     "  4 - I/O error\n"
-                    "  5 - PNG error\n");
+                    "  5 - PNG error\n"
+                    "  6 - Extracted payload does not match digest\n");
+}
+
+/* Run a single embed/extract/verify request, returning a STEG_* code */
+static int run_command(const char *op, char **args, int count) {
+    bool success;
+
+    /* Trailing empty fields are treated as absent */
+    while (count > 0 && !args[count - 1][0]) {
+        count--;
+    }
+
+    if (op[0] == 'e' && op[1] == 'm' && count == 3) { /* embed */
+        success = steg_embed(args[0], args[1], args[2]);
+    } else if (op[0] == 'e' && op[1] == 'x' && count == 2) { /* extract */
+        success = steg_extract(args[0], args[1]);
+    } else if (op[0] == 'v' && count == 4) { /* verify */
+        return steg_verify(args[0], args[1], args[2], args[3]);
+    } else {
+        return STEG_ERROR_ARGS;
+    }
+
+    return success ? STEG_SUCCESS : STEG_ERROR_IO;
+}
+
+/* Persistent worker: one "op\targ1\targ2[\targ3[\targ4]]" line in, one return code line out.
+ * Lines between "BEGIN" and "END" form a batch: each is prefixed with a caller
+ * chosen id ("id\top\t...") and is answered with an "id\treturn_code" line
+ * as soon as it completes. */
+static int run_server(void) {
+    /* Three paths of up to MAX_PATH UTF-16 units (up to 3 UTF-8 bytes each),
+     * the hex digest, and the id, operation and tabs */
+    char line[3 * MAX_PATH * 3 + STEG_DIGEST_SIZE * 2 + 32];
+    char *fields[6];
+    char *p;
+    int c, count, max_fields, rc;
+    bool in_batch = false;
+    bool overlong;
+    const char *id;
+
+    /* Handshake so callers can detect server support */
+    fputs("pxpl-server 1\n", stdout);
+    fflush(stdout);
+
+    while (fgets(line, sizeof(line), stdin)) {
+        /* A request that does not fit is rejected; discard the rest of the
+         * line so it still gets exactly one reply */
+        overlong = !strchr(line, '\n') && !feof(stdin);
+        if (overlong) {
+            while ((c = getchar()) != EOF && c != '\n') {
+            }
+        }
+
+        line[strcspn(line, "\r\n")] = '\0';
+        if (!line[0]) {
+            continue;
+        }
+
+        if (strcmp(line, "BEGIN") == 0) {
+            in_batch = true;
+            continue;
+        }
+        if (strcmp(line, "END") == 0) {
+            in_batch = false;
+            continue;
+        }
+
+        /* Split on tabs in place */
+        max_fields = in_batch ? 6 : 5;
+        count = 0;
+        fields[count++] = line;
+        for (p = line; *p && count < max_fields; p++) {
+            if (*p == '\t') {
+                *p = '\0';
+                fields[count++] = p + 1;
+            }
+        }
+
+        /* Batch entries carry a leading completion id */
+        id = NULL;
+        if (in_batch) {
+            id = fields[0];
+            memmove(fields, fields + 1, (size_t)--count * sizeof(fields[0]));
+        }
+
+        rc = overlong ? STEG_ERROR_ARGS : run_command(fields[0], fields + 1, count - 1);
+
+        /* Flush every reply so batch completions stream back as they finish */
+        if (id) {
+            fprintf(stdout, "%s\t%d\n", id, rc);
+        } else {
+            fprintf(stdout, "%d\n", rc);
+        }
+        fflush(stdout);
+    }
+
+    return STEG_SUCCESS;
 }
 
 int main(int argc, char **argv) {
@@ -31,7 +130,11 @@ int main(int argc, char **argv) {
     /* Optimized command dispatch using string length + first char */
     cmd = argv[1];
     
-    if (cmd[0] == 'e') {
+    if (cmd[0] == '-' && cmd[1] == '-' && cmd[2] == 's' && argc == 2) { /* --server */
+        return run_server();
+    } else if (cmd[0] == 'v' && argc == 6) { /* verify */
+        return steg_verify(argv[2], argv[3], argv[4], argv[5]);
+    } else if (cmd[0] == 'e') {
         if (cmd[1] == 'm' && argc == 5) { /* embed */
             success = steg_embed(argv[2], argv[3], argv[4]);
         } else if (cmd[1] == 'x' && argc == 4) { /* extract */
@@ -1,4 +1,5 @@
 #include "steg.h"
+#include <bcrypt.h>
 #include <stdlib.h>
 #include <string.h>
 
@@ -122,25 +123,16 @@ cleanup:
     return success;
 }
 
-/* Extracts hidden payload from steg image */
-bool steg_extract(const char *steg_path, const char *output_path) {
-    ImageInfo steg = {0};
-    FILE *output_file = NULL;
-    uint8_t *payload_data = NULL;
+/* Reads the embedded payload of an open steg image into a newly allocated buffer */
+static bool read_payload(ImageInfo *steg, uint8_t **payload_out, uint32_t *size_out) {
+    uint8_t *payload_data;
     uint32_t payload_size = 0;
-    bool success = false;
     StegContext ctx = {0};
     uint32_t i, j, bit_offset;
     uint8_t byte;
     
-    /* Open steg image */
-    if (!image_open_read(steg_path, &steg)) {
-        fprintf(stderr, "Error: Could not open steg image\n");
-        return false;
-    }
-    
     /* Setup steganography context */
-    ctx.image = &steg;
+    ctx.image = steg;
     
     /* Extract payload size from the first 32 LSBs (little-endian) - optimized */
     for (i = 0; i < 32; i++) {
@@ -149,9 +141,8 @@ bool steg_extract(const char *steg_path, const char *output_path) {
     fprintf(stderr, "Extracted payload_size: %u\n", payload_size);
     
     /* Validate extracted size against image capacity */
-    if (payload_size > steg.capacity / 8) {
+    if (payload_size > steg->capacity / 8) {
         fprintf(stderr, "Error: Invalid payload size detected (%u bytes)\n", payload_size);
-        image_close(&steg);
         return false;
     }
     
@@ -159,7 +150,6 @@ bool steg_extract(const char *steg_path, const char *output_path) {
     payload_data = (uint8_t *)malloc(payload_size);
     if (!payload_data) {
         fprintf(stderr, "Error: Memory allocation failed\n");
-        image_close(&steg);
         return false;
     }
     
@@ -173,6 +163,30 @@ bool steg_extract(const char *steg_path, const char *output_path) {
         payload_data[i] = byte;
     }
     
+    *payload_out = payload_data;
+    *size_out = payload_size;
+    return true;
+}
+
+/* Extracts hidden payload from steg image */
+bool steg_extract(const char *steg_path, const char *output_path) {
+    ImageInfo steg = {0};
+    FILE *output_file = NULL;
+    uint8_t *payload_data = NULL;
+    uint32_t payload_size = 0;
+    bool success = false;
+    
+    /* Open steg image */
+    if (!image_open_read(steg_path, &steg)) {
+        fprintf(stderr, "Error: Could not open steg image\n");
+        return false;
+    }
+    
+    if (!read_payload(&steg, &payload_data, &payload_size)) {
+        image_close(&steg);
+        return false;
+    }
+    
     /* Open output file */
     output_file = fopen(output_path, "wb");
     if (!output_file) {
@@ -201,3 +215,78 @@ bool steg_extract(const char *steg_path, const char *output_path) {
     
     return success;
 }
+
+/* Parses one hex digit, returning -1 if invalid */
+static int hex_value(char c) {
+    if (c >= '0' && c <= '9') return c - '0';
+    if (c >= 'a' && c <= 'f') return c - 'a' + 10;
+    if (c >= 'A' && c <= 'F') return c - 'A' + 10;
+    return -1;
+}
+
+/* Embeds payload, reads it back from the written steg image and checks its SHA-256 */
+int steg_verify(const char *cover_path, const char *payload_path, const char *steg_path,
+                const char *expected_hex) {
+    ImageInfo steg = {0};
+    uint8_t *payload_data = NULL;
+    uint32_t payload_size = 0;
+    uint8_t expected[STEG_DIGEST_SIZE];
+    uint8_t digest[STEG_DIGEST_SIZE];
+    int result = STEG_ERROR_IO;
+    int hi, lo;
+    size_t i;
+    
+    /* Decode expected digest before doing any work */
+    if (strlen(expected_hex) != STEG_DIGEST_SIZE * 2) {
+        fprintf(stderr, "Error: Expected a %d character SHA-256 hex digest\n", STEG_DIGEST_SIZE * 2);
+        return STEG_ERROR_ARGS;
+    }
+    for (i = 0; i < STEG_DIGEST_SIZE; i++) {
+        hi = hex_value(expected_hex[i * 2]);
+        lo = hex_value(expected_hex[i * 2 + 1]);
+        if (hi < 0 || lo < 0) {
+            fprintf(stderr, "Error: Invalid hex digest\n");
+            return STEG_ERROR_ARGS;
+        }
+        expected[i] = (uint8_t)((hi << 4) | lo);
+    }
+    
+    /* Round-trip through the real PNG encoder so LSB corruption is caught */
+    if (!steg_embed(cover_path, payload_path, steg_path)) {
+        return STEG_ERROR_IO;
+    }
+    
+    if (!image_open_read(steg_path, &steg)) {
+        fprintf(stderr, "Error: Could not reopen steg image\n");
+        return STEG_ERROR_IO;
+    }
+    
+    if (!read_payload(&steg, &payload_data, &payload_size)) {
+        image_close(&steg);
+        return STEG_ERROR_IO;
+    }
+    
+    /* Hash the extracted payload in memory. The pseudo-handle skips opening a
+     * provider per call and CNG dispatches to SHA-NI where the CPU has it */
+    if (!BCRYPT_SUCCESS(BCryptHash(BCRYPT_SHA256_ALG_HANDLE, NULL, 0, payload_data, payload_size,
+                                   digest, STEG_DIGEST_SIZE))) {
+        fprintf(stderr, "Error: Failed to hash extracted payload\n");
+        goto cleanup;
+    }
+    
+    if (memcmp(digest, expected, STEG_DIGEST_SIZE) == 0) {
+        fprintf(stderr, "Successfully verified %u bytes\n", payload_size);
+        result = STEG_SUCCESS;
+    } else {
+        fprintf(stderr, "Error: Extracted payload does not match expected digest\n");
+        result = STEG_ERROR_VERIFY;
+    }
+    
+cleanup:
+    /* Security: zero the buffer before freeing */
+    memset(payload_data, 0, payload_size);
+    free(payload_data);
+    image_close(&steg);
+    
+    return result;
+}